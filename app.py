@@ -1,46 +1,243 @@
 print("Starting Flask app...")
 
-from flask import Flask, Blueprint, render_template, request, jsonify, send_file
-import validators
+from flask import Flask, render_template, request, jsonify, Response, make_response
+from flask.json import JSONEncoder, JSONDecoder
 import logging
-import pandas as pd
+import orjson
+import csv
 import io
 import asyncio
-from datetime import datetime, timezone
+from datetime import datetime
+from urllib.parse import urlsplit
 import zipfile
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
+from zipstream import ZipStream
+from werkzeug.http import generate_etag
 from markdown2 import Markdown
 import os
+import re
+import ipaddress
 import atexit
+import time
 
 from headers import get_media_dates
-from rdap import get_domain_info, get_domain_info_async
-from certs import get_first_certificate, extract_main_domain, get_certificate_data
+from rdap import get_domain_info_async
+from certs import get_first_certificate, extract_main_domain
 from chrome_driver_pool import driver_pool
+from cache import TTLCache, SingleFlight
+from http_session import create_session
+
+class ORJSONEncoder(JSONEncoder):
+    """Flask JSON encoder backed by orjson, using Flask's default() for types orjson leaves alone"""
+
+    def encode(self, o):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(o, default=self.default, option=option).decode()
+
+class ORJSONDecoder(JSONDecoder):
+    """Flask JSON decoder backed by orjson, used by request.get_json()"""
+
+    def decode(self, s, *args, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json_encoder = ORJSONEncoder
+app.json_decoder = ORJSONDecoder
 
-# Configure detailed logging
+# Configure logging, set LOG_LEVEL=DEBUG for detailed request logging
+log_level = getattr(logging, os.environ.get('LOG_LEVEL', 'INFO').upper(), logging.INFO)
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=log_level,
     format='%(asctime)s [%(levelname)s] %(name)s - %(message)s',
     handlers=[
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
-app.logger.setLevel(logging.DEBUG)
+app.logger.setLevel(log_level)
 
 # Add this near your other imports
 markdowner = Markdown()
 
+# Cache of successful lookups so repeat searches skip the network.
+# RDAP and certificate results are keyed by domain, headers by the full URL.
+# Every entry is stored with its lookup type's TTL from CACHE_TTLS below.
+result_cache = TTLCache(maxsize=int(os.environ.get('CACHE_MAXSIZE', 1024)))
+
+# Registration data and certificate history change over days, page media can change any time
+CACHE_TTLS = {
+    'rdap': int(os.environ.get('RDAP_CACHE_TTL', 86400)),
+    'certs': int(os.environ.get('CERTS_CACHE_TTL', 86400)),
+    'headers': int(os.environ.get('HEADERS_CACHE_TTL', 3600))
+}
+
+# Requests for the same lookup that arrive while it's running share its result
+inflight_lookups = SingleFlight()
+
+def cache_refresh_requested():
+    """True if the request asked to skip cached results with ?nocache=1"""
+    return request.args.get('nocache') == '1'
+
+async def cached_domain_info(domain, refresh=False):
+    """get_domain_info_async with results cached per domain, refresh skips the cache lookup"""
+    key = ('rdap', domain)
+    results = None if refresh else result_cache.get(key)
+    if results is not None:
+        logger.info(f"[CACHE] RDAP cache hit for {domain}")
+        return results
+
+    results = await inflight_lookups.run(key, get_domain_info_async, domain)
+    if results and not any(r.get('type') == 'Error' for r in results):
+        result_cache.set(key, results, ttl=CACHE_TTLS['rdap'])
+    return results
+
+async def cached_first_certificate(domain, session=None, refresh=False):
+    """get_first_certificate with successful results cached per domain, refresh skips the cache lookup"""
+    key = ('certs', domain)
+    cert_data = None if refresh else result_cache.get(key)
+    if cert_data is not None:
+        logger.info(f"[CACHE] Certificate cache hit for {domain}")
+        return True, cert_data
+
+    success, cert_data = await inflight_lookups.run(key, get_first_certificate, domain, session=session)
+    if success:
+        result_cache.set(key, cert_data, ttl=CACHE_TTLS['certs'])
+    return success, cert_data
+
+async def cached_media_dates(url, session=None, refresh=False):
+    """get_media_dates with results cached per URL, refresh skips the cache lookup"""
+    key = ('headers', url)
+    results = None if refresh else result_cache.get(key)
+    if results is not None:
+        logger.info(f"[CACHE] Headers cache hit for {url}")
+        return results
+
+    results = await inflight_lookups.run(key, get_media_dates, url, session=session)
+    if results and not (len(results) == 1 and results[0].get('type') in ['Error', 'Info']):
+        result_cache.set(key, results, ttl=CACHE_TTLS['headers'])
+    return results
+
+# Fetchers for the concurrent 'all' search. They share one signature so /analyze
+# can dispatch on the result key, and turn failures into error entries.
+async def fetch_rdap(url, domain, session, refresh=False):
+    try:
+        results = await cached_domain_info(domain, refresh=refresh)
+        return results if results else [{
+            'type': 'Error',
+            'error': 'No RDAP data could be found.'
+        }]
+    except Exception as e:
+        logging.error(f"Error getting RDAP data: {str(e)}")
+        return [{
+            'type': 'Error',
+            'error': f'Error retrieving RDAP data: {str(e)}'
+        }]
+
+async def fetch_headers(url, domain, session, refresh=False):
+    try:
+        results = await cached_media_dates(url, session=session, refresh=refresh)
+        return results if results else [{
+            'type': 'Error',
+            'error': 'No header data could be found.'
+        }]
+    except Exception as e:
+        logging.error(f"Error getting headers data: {str(e)}")
+        return [{
+            'type': 'Error',
+            'error': f'Error retrieving header data: {str(e)}'
+        }]
+
+async def fetch_certs(url, domain, session, refresh=False):
+    try:
+        success, cert_data = await cached_first_certificate(domain, session=session, refresh=refresh)
+        if success:
+            return [cert_data]
+        else:
+            # Pass through the error from certs.py
+            return [cert_data]
+    except Exception as e:
+        logging.error(f"Error getting certificate data: {str(e)}")
+        return [{
+            'type': 'SSL Certificate',
+            'error': 'Unable to retrieve certificate data',
+            'status': 'Error',
+            'message': 'The certificate service is currently unavailable. Please try again later.'
+        }]
+
+ANALYZE_FETCHERS = {
+    'rdap': fetch_rdap,
+    'headers': fetch_headers,
+    'certs': fetch_certs
+}
+
+# Single-type lookups for /analyze and /search, returning the rows to send back
+async def lookup_rdap(url, domain, refresh=False):
+    return await cached_domain_info(domain, refresh=refresh) or []
+
+async def lookup_headers(url, domain, refresh=False):
+    return await cached_media_dates(url, refresh=refresh) or []
+
+async def lookup_certs(url, domain, refresh=False):
+    success, cert_data = await cached_first_certificate(domain, refresh=refresh)
+    if not success:
+        logging.error(f"Certificate error: {cert_data}")
+    # Errors from certs.py are passed through as a result row
+    return [cert_data]
+
+SEARCH_LOOKUPS = {
+    'rdap': lookup_rdap,
+    'headers': lookup_headers,
+    'certs': lookup_certs
+}
+
 # Add markdown filter
 @app.template_filter('markdown')
 def markdown_filter(text):
     return markdowner.convert(text)
 
+def render_markdown_file(name):
+    """Read a markdown file from the templates folder and convert it to HTML"""
+    md_path = os.path.join(app.root_path, 'templates', f'{name}.md')
+    with open(md_path, 'r') as f:
+        return markdowner.convert(f.read())
+
+# The about/FAQ pages are static, so render them once at startup
+markdown_pages = {}
+for page_name in ('about', 'faq'):
+    try:
+        markdown_pages[page_name] = render_markdown_file(page_name)
+    except Exception as e:
+        logger.error(f"Error pre-rendering {page_name}.md: {str(e)}")
+
+def get_markdown_page(name):
+    """Return the cached HTML for a markdown page, re-rendering in debug mode so edits show up"""
+    html_content = markdown_pages.get(name)
+    if html_content is None or app.debug:
+        html_content = render_markdown_file(name)
+        markdown_pages[name] = html_content
+    return html_content
+
+# Full about/FAQ page HTML and its ETag, rendered on the first request for each page
+rendered_pages = {}
+
+def markdown_page_response(name):
+    """Serve a markdown page in its template, answering repeat visits with 304 Not Modified"""
+    page = rendered_pages.get(name)
+    if page is None or app.debug:
+        html = render_template(f'{name}.html', content=get_markdown_page(name))
+        page = (html, generate_etag(html.encode('utf-8')))
+        rendered_pages[name] = page
+
+    html, etag = page
+    response = make_response(html)
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
+
 # Global error handler to ensure all errors return JSON
 @app.errorhandler(Exception)
 def handle_exception(e):
@@ -49,19 +246,48 @@ def handle_exception(e):
 
 @app.before_request
 def log_all_requests():
+    # Dumping headers and bodies is expensive, only do it when DEBUG is on
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     logger.debug("=" * 80)
-    logger.debug(f"Request Method: {request.method}")
-    logger.debug(f"Request URL: {request.url}")
-    logger.debug(f"Request Path: {request.path}")
-    logger.debug(f"Request Headers: {dict(request.headers)}")
-    if request.is_json:
-        try:
-            logger.debug(f"Request JSON: {request.get_json()}")
-        except Exception as e:
-            logger.debug(f"Raw Request Data: {request.get_data(as_text=True)}")
-            logger.debug(f"Failed to parse JSON: {str(e)}")
+    logger.debug("Request Method: %s", request.method)
+    logger.debug("Request URL: %s", request.url)
+    logger.debug("Request Path: %s", request.path)
+    logger.debug("Request Headers: %s", dict(request.headers))
+    # Log the body size only, reading the body here would buffer large exports twice
+    logger.debug("Request Content-Type: %s, Content-Length: %s", request.content_type, request.content_length)
     logger.debug("=" * 80)
 
+# Dot-separated DNS labels ending in an alphabetic or punycode TLD, e.g. www.example.co.uk
+HOSTNAME_RE = re.compile(
+    r'^(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+(?:[a-z]{2,63}|xn--[a-z0-9-]{1,59})$',
+    re.IGNORECASE
+)
+
+def is_valid_url(url):
+    """Check that url is an absolute http(s) URL whose host is a domain name or IP address"""
+    if not isinstance(url, str):
+        return False
+    try:
+        parts = urlsplit(url)
+        parts.port  # Raises ValueError for a malformed port
+    except ValueError:
+        return False
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        return False
+    
+    try:
+        ipaddress.ip_address(parts.hostname)
+        return True
+    except ValueError:
+        pass
+    
+    try:
+        hostname = parts.hostname.encode('idna').decode('ascii')
+    except UnicodeError:
+        return False
+    return bool(HOSTNAME_RE.match(hostname))
+
 @app.route('/', methods=['GET'])
 def index():
     logging.debug("Index route called!")
@@ -73,11 +299,7 @@ def index():
 
 @app.route('/analyze', methods=['POST'])
 async def analyze():
-    logger.debug("Analyze route called with:")
-    logger.debug(f"Headers: {dict(request.headers)}")
-    logger.debug(f"Raw Data: {request.get_data(as_text=True)}")
-    logger.debug(f"Content Type: {request.content_type}")
-    logger.debug(f"Mimetype: {request.mimetype}")
+    logger.debug("Analyze route called")
     
     try:
         # Validate content type
@@ -88,13 +310,13 @@ async def analyze():
         try:
             # Get JSON data from request
             data = request.get_json()
-            logger.debug(f"Parsed JSON data: {data}")
+            logger.debug("Parsed JSON data: %s", data)
         except Exception as e:
             logger.error(f"Failed to parse JSON data: {str(e)}")
-            logger.error(f"Raw request data: {request.get_data(as_text=True)}")
+            logger.error(f"Raw request data (first 512 chars): {request.get_data(as_text=True)[:512]}")
             return jsonify({'error': 'Invalid JSON format'}), 400
             
-        if not data or 'url' not in data:
+        if not isinstance(data, dict) or 'url' not in data:
             logging.error("No URL provided")
             return jsonify({'error': 'No URL provided'}), 400
         
@@ -102,12 +324,16 @@ async def analyze():
         search_type = data.get('searchType', 'all')  # Default to 'all' if not specified
         logging.info(f"[ANALYZE] Processing {search_type} search for URL: {url}")
         
-        if not validators.url(url):
+        if not is_valid_url(url):
             logging.error(f"Invalid URL format: {url}")
             return jsonify({'error': 'Invalid URL format'}), 400
+
+        if search_type != 'all' and search_type not in SEARCH_LOOKUPS:
+            return jsonify({'error': 'Invalid search type'}), 400
         
         domain = extract_main_domain(url)
-        logging.debug(f"Extracted domain: {domain}")
+        logging.debug("Extracted domain: %s", domain)
+        refresh = cache_refresh_requested()
         
         all_results = {
             'rdap': [],
@@ -120,109 +346,67 @@ async def analyze():
             if search_type == 'all':
                 logging.debug("Getting all data types concurrently...")
                 
-                # Define async functions for all data sources
-                async def fetch_rdap():
-                    try:
-                        results = await get_domain_info_async(domain)
-                        return results if results else [{
-                            'type': 'Error',
-                            'error': 'No RDAP data could be found.'
-                        }]
-                    except Exception as e:
-                        logging.error(f"Error getting RDAP data: {str(e)}")
-                        return [{
-                            'type': 'Error',
-                            'error': f'Error retrieving RDAP data: {str(e)}'
-                        }]
-
-                async def fetch_headers():
-                    try:
-                        results = await get_media_dates(url)
-                        return results if results else [{
-                            'type': 'Error',
-                            'error': 'No header data could be found.'
-                        }]
-                    except Exception as e:
-                        logging.error(f"Error getting headers data: {str(e)}")
-                        return [{
-                            'type': 'Error',
-                            'error': f'Error retrieving header data: {str(e)}'
-                        }]
-
-                async def fetch_certs():
-                    try:
-                        success, cert_data = await get_first_certificate(domain)
-                        if success:
-                            return [cert_data]
-                        else:
-                            # Pass through the error from certs.py
-                            return [cert_data]
-                    except Exception as e:
-                        logging.error(f"Error getting certificate data: {str(e)}")
-                        return [{
-                            'type': 'SSL Certificate',
-                            'error': 'Unable to retrieve certificate data',
-                            'status': 'Error',
-                            'message': 'The certificate service is currently unavailable. Please try again later.'
-                        }]
+                # One session for the whole request so headers and certs share a connection pool
+                session = create_session()
 
                 # Try concurrent execution first
-                tasks_started = datetime.now(timezone.utc)
-                logging.info(f"[TASKS] Starting concurrent execution at {tasks_started}")
+                # Log records carry their own timestamp, monotonic time is only for the duration
+                tasks_started = time.monotonic()
+                logging.info("[TASKS] Starting concurrent execution")
                 
+                completed = set()  # Keys whose result is already in all_results
+                tasks = {}
+
                 try:
                     # Run all three tasks concurrently
-                    rdap_task = asyncio.create_task(fetch_rdap())
-                    headers_task = asyncio.create_task(fetch_headers())
-                    certs_task = asyncio.create_task(fetch_certs())
-                    active_tasks = [rdap_task, headers_task, certs_task]
+                    tasks = {asyncio.create_task(fetch(url, domain, session, refresh=refresh)): key for key, fetch in ANALYZE_FETCHERS.items()}
+                    
+                    # Wait for all tasks with a timeout, keeping the results of any that finish in time
+                    done, pending = await asyncio.wait(tasks.keys(), timeout=60)  # 60 second timeout for concurrent execution
+                    
+                    for task in done:
+                        # Exceptions are kept as results and turned into error entries below
+                        error = task.exception()
+                        all_results[tasks[task]] = error if error else task.result()
+                        completed.add(tasks[task])
                     
-                    try:
-                        # Wait for all tasks with a timeout
-                        all_results['rdap'], all_results['headers'], all_results['certs'] = await asyncio.wait_for(
-                            asyncio.gather(*active_tasks, return_exceptions=True),
-                            timeout=60  # 60 second timeout for concurrent execution
-                        )
+                    if not pending:
                         logging.info("[TASKS] All concurrent tasks completed successfully")
-                        
-                    except asyncio.TimeoutError:
-                        logging.warning("[TASKS] Concurrent execution timed out, falling back to sequential execution")
-                        # Cancel and clean up any pending tasks
-                        for task in active_tasks:
-                            if not task.done():
-                                task.cancel()
-                                try:
-                                    await task
-                                except asyncio.CancelledError:
-                                    logging.info(f"[TASKS] Successfully cancelled task {task}")
-                                except Exception as e:
-                                    logging.error(f"[TASKS] Error cancelling task {task}: {str(e)}")
-                        
-                        # Run sequentially
-                        logging.info("[TASKS] Starting sequential execution after timeout")
-                        all_results['rdap'] = await fetch_rdap()
-                        all_results['headers'] = await fetch_headers()
-                        all_results['certs'] = await fetch_certs()
+                    else:
+                        timed_out = [key for task, key in tasks.items() if task in pending]
+                        logging.warning(f"[TASKS] Concurrent execution timed out for {', '.join(timed_out)}")
+                        # Cancel the stragglers and wait for them to unwind so they release their connections.
+                        # Re-running them would just repeat the lookups that were already too slow.
+                        for task in pending:
+                            task.cancel()
+                        await asyncio.gather(*pending, return_exceptions=True)
+
+                        for key in timed_out:
+                            all_results[key] = [{
+                                'type': 'Error',
+                                'error': 'This lookup timed out. Please try again later.'
+                            }]
+                            completed.add(key)
                         
                 except Exception as e:
                     logging.error(f"[TASKS] Error during concurrent execution: {str(e)}")
-                    # Run sequentially as fallback
-                    logging.info("[TASKS] Starting sequential execution after error")
-                    all_results['rdap'] = await fetch_rdap()
-                    all_results['headers'] = await fetch_headers()
-                    all_results['certs'] = await fetch_certs()
+                    # Cancel anything still running and report the error for each unfinished lookup
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    for key in ANALYZE_FETCHERS:
+                        if key not in completed:
+                            all_results[key] = e
                 
                 finally:
                     # Clean up and log completion
-                    tasks_completed = datetime.now(timezone.utc)
-                    duration = (tasks_completed - tasks_started).total_seconds()
-                    logging.info(f"[TASKS] All tasks completed at {tasks_completed} (took {duration:.2f} seconds)")
+                    duration = time.monotonic() - tasks_started
+                    logging.info(f"[TASKS] All tasks completed (took {duration:.2f} seconds)")
                     
-                    # Force cleanup of any resources
-                    driver_pool.cleanup_all()
-                    logging.info("[TASKS] WebDriver pool cleaned up")
+                    # Close the request's HTTP session, WebDrivers stay pooled for the next request
+                    await session.close()
 
-                # Handle any exceptions from gather
+                # Turn any exceptions from the tasks into error entries
                 for key, result in all_results.items():
                     if isinstance(result, Exception):
                         logging.error(f"[TASKS] Error in {key} task: {str(result)}")
@@ -235,29 +419,11 @@ async def analyze():
                 
                 return jsonify(all_results)
                 
-            elif search_type == 'rdap':
-                logging.info("[ANALYZE] Starting RDAP lookup")
-                results = await get_domain_info_async(domain)
-                logging.info("[ANALYZE] RDAP lookup completed")
-                return jsonify(results if results else [])
-                
-            elif search_type == 'headers':
-                logging.debug("Getting media dates...")
-                results = await get_media_dates(url)
-                return jsonify(results if results else [])
-                
-            elif search_type == 'certs':
-                logging.debug("Getting certificate data...")
-                success, cert_data = await get_first_certificate(domain)
-                if success:
-                    return jsonify([cert_data])
-                else:
-                    logging.error(f"Certificate error: {cert_data}")
-                    # Pass through the error from certs.py
-                    return jsonify([cert_data])
-            
             else:
-                return jsonify({'error': 'Invalid search type'}), 400
+                logging.info(f"[ANALYZE] Starting {search_type} lookup")
+                results = await SEARCH_LOOKUPS[search_type](url, domain, refresh=refresh)
+                logging.info(f"[ANALYZE] {search_type} lookup completed")
+                return jsonify(results)
                 
         except Exception as e:
             logging.error(f"Error processing request: {str(e)}", exc_info=True)
@@ -267,129 +433,80 @@ async def analyze():
         logging.error(f"Error in analyze route: {str(e)}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
+# (request key, filename suffix) for each table in an "all" export
+EXPORT_TABLES = [
+    ('rdap_data', 'rdap'),
+    ('headers_data', 'headers'),
+    ('cert_data', 'certs'),
+]
+
+def iter_csv_bytes(rows, batch_size=500):
+    """Yield a list of dicts as UTF-8 CSV chunks, reusing one text buffer between batches"""
+    buffer = io.StringIO()
+    fieldnames = list(dict.fromkeys(key for row in rows for key in row))
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, lineterminator='\n')
+    writer.writeheader()
+    for start in range(0, len(rows), batch_size):
+        writer.writerows(rows[start:start + batch_size])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    tail = buffer.getvalue()  # Header only, when there are no rows
+    if tail:
+        yield tail.encode('utf-8')
+
+def export_name_prefix(data):
+    """Build the domain_DDMMYYYY prefix used for export filenames"""
+    # Replace dots with underscores in domain name
+    domain = data.get('domain', 'unknown').replace('.', '_')
+    # Format timestamp as DDMMYYYY
+    timestamp = datetime.now().strftime('%d%m%Y')
+    return f"{domain}_{timestamp}"
+
+def zip_export_response(data):
+    """Stream a ZIP file containing a CSV for each table in data, compressing as the client reads it"""
+    name_prefix = export_name_prefix(data)
+    zip_stream = ZipStream(compress_type=zipfile.ZIP_DEFLATED, compress_level=6)
+    for key, suffix in EXPORT_TABLES:
+        if key in data:
+            zip_stream.add(iter_csv_bytes(data[key]), f"{name_prefix}_{suffix}.csv")
+
+    zip_filename = f"{name_prefix}_all.zip"
+    return Response(
+        zip_stream,
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{zip_filename}"'}
+    )
+
+# /export/all is matched by this rule too, with export_type='all'
 @app.route('/export/<export_type>', methods=['POST'])
 def export(export_type):
     try:
         data = request.json
-        domain = data.get('domain', 'unknown')
-        # Replace dots with underscores in domain name
-        domain = domain.replace('.', '_')
-        # Format timestamp as DDMMYYYY
-        timestamp = datetime.now().strftime('%d%m%Y')
         
         if export_type == 'all':
-            # Create a ZIP file containing all CSVs
-            memory_file = io.BytesIO()
-            with zipfile.ZipFile(memory_file, 'w') as zf:
-                # Export RDAP data
-                if 'rdap_data' in data:
-                    rdap_df = pd.DataFrame(data['rdap_data'])
-                    rdap_csv = io.StringIO()
-                    rdap_df.to_csv(rdap_csv, index=False)
-                    rdap_filename = f"{domain}_{timestamp}_rdap.csv"
-                    zf.writestr(rdap_filename, rdap_csv.getvalue())
-
-                # Export Headers data
-                if 'headers_data' in data:
-                    headers_df = pd.DataFrame(data['headers_data'])
-                    headers_csv = io.StringIO()
-                    headers_df.to_csv(headers_csv, index=False)
-                    headers_filename = f"{domain}_{timestamp}_headers.csv"
-                    zf.writestr(headers_filename, headers_csv.getvalue())
-                    
-                # Export Certificate data
-                if 'cert_data' in data:
-                    cert_df = pd.DataFrame(data['cert_data'])
-                    cert_csv = io.StringIO()
-                    cert_df.to_csv(cert_csv, index=False)
-                    cert_filename = f"{domain}_{timestamp}_certs.csv"
-                    zf.writestr(cert_filename, cert_csv.getvalue())
-
-            memory_file.seek(0)
-            zip_filename = f"{domain}_{timestamp}_all.zip"
-            response = send_file(
-                memory_file,
-                mimetype='application/zip',
-                as_attachment=True,
-                download_name=zip_filename
-            )
-            response.headers['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
-            return response
+            return zip_export_response(data)
         else:
-            # Export single table
-            df = pd.DataFrame(data['table_data'])
-            output = io.StringIO()
-            df.to_csv(output, index=False)
+            # Export single table, streamed in batches of rows
+            csv_chunks = iter_csv_bytes(data['table_data'])
             
-            filename = f"{domain}_{timestamp}_{export_type}.csv"
+            filename = f"{export_name_prefix(data)}_{export_type}.csv"
             
-            response = send_file(
-                io.BytesIO(output.getvalue().encode('utf-8')),
+            return Response(
+                csv_chunks,
                 mimetype='text/csv',
-                as_attachment=True,
-                download_name=filename
+                headers={'Content-Disposition': f'attachment; filename="{filename}"'}
             )
-            response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
             
     except Exception as e:
         logging.error(f"Error in export route: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/export/all', methods=['POST'])
-def export_all():
-    try:
-        data = request.json
-        domain = data.get('domain', 'unknown')
-        # Replace dots with underscores in domain name
-        domain = domain.replace('.', '_')
-        # Format timestamp as DDMMYYYY
-        timestamp = datetime.now().strftime('%d%m%Y')
-        
-        memory_file = io.BytesIO()
-        with zipfile.ZipFile(memory_file, 'w') as zf:
-            # Export RDAP data
-            if 'rdap_data' in data:
-                rdap_df = pd.DataFrame(data['rdap_data'])
-                rdap_csv = io.StringIO()
-                rdap_df.to_csv(rdap_csv, index=False)
-                rdap_filename = f"{domain}_{timestamp}_rdap.csv"
-                zf.writestr(rdap_filename, rdap_csv.getvalue())
-
-            # Export Certificate data
-            if 'cert_data' in data:
-                cert_df = pd.DataFrame(data['cert_data'])
-                cert_csv = io.StringIO()
-                cert_df.to_csv(cert_csv, index=False)
-                cert_filename = f"{domain}_{timestamp}_certs.csv"
-                zf.writestr(cert_filename, cert_csv.getvalue())
-
-            # Export Headers data
-            if 'headers_data' in data:
-                headers_df = pd.DataFrame(data['headers_data'])
-                headers_csv = io.StringIO()
-                headers_df.to_csv(headers_csv, index=False)
-                headers_filename = f"{domain}_{timestamp}_headers.csv"
-                zf.writestr(headers_filename, headers_csv.getvalue())
-
-        memory_file.seek(0)
-        zip_filename = f"{domain}_{timestamp}_all.zip"
-        response = send_file(
-            memory_file,
-            mimetype='application/zip',
-            as_attachment=True,
-            download_name=zip_filename
-        )
-        response.headers['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
-        return response
-    except Exception as e:
-        logging.error(f"Error in export route: {str(e)}")
-        return jsonify({'error': str(e)}), 500
-
 @app.route('/search', methods=['POST'])
 async def search():
-    task_started = datetime.now(timezone.utc)
-    logging.info(f"[TASK] Starting {request.method} /search at {task_started}")
+    task_started = time.monotonic()
+    logging.info(f"[TASK] Starting {request.method} /search")
     
     try:
         # Handle both form data and JSON data
@@ -405,45 +522,29 @@ async def search():
         
         if not domain:
             return jsonify({'error': 'No domain provided'}), 400
+
+        refresh = cache_refresh_requested()
+            
+        lookup = SEARCH_LOOKUPS.get(search_type)
+        if lookup is None:
+            return jsonify({'error': 'Invalid search type'}), 400
             
         try:
-            if search_type == 'rdap':
-                results = get_domain_info(domain)
-                logging.info("[TASK] RDAP search completed")
-            elif search_type == 'headers':
-                results = await get_media_dates(domain)
-                logging.info("[TASK] Headers search completed")
-            elif search_type == 'certs':
-                success, cert_data = await get_first_certificate(domain)
-                if success:
-                    results = [cert_data]
-                    logging.info("[TASK] Certificate search completed successfully")
-                else:
-                    results = [{
-                        'type': 'SSL Certificate',
-                        'error': str(cert_data) if isinstance(cert_data, str) else cert_data.get('error', 'Unknown error'),
-                        'status': cert_data.get('status', 'Error') if isinstance(cert_data, dict) else 'Error',
-                        'message': cert_data.get('message', 'Unable to retrieve certificate data') if isinstance(cert_data, dict) else str(cert_data)
-                    }]
-                    logging.warning("[TASK] Certificate search completed with errors")
-            else:
-                return jsonify({'error': 'Invalid search type'}), 400
-                
+            # /search is given a bare domain, which also serves as the URL for the headers lookup
+            results = await lookup(domain, domain, refresh=refresh)
+            logging.info(f"[TASK] {search_type} search completed")
+
         except Exception as e:
             logging.error(f"[TASK] Error during {search_type} search: {str(e)}")
             raise
             
         finally:
-            # Clean up resources
-            driver_pool.cleanup_all()
-            logging.info("[TASK] WebDriver pool cleaned up")
-            
             # Log completion time and duration
-            task_completed = datetime.now(timezone.utc)
-            duration = (task_completed - task_started).total_seconds()
-            logging.info(f"[TASK] Search completed at {task_completed} (took {duration:.2f} seconds)")
+            duration = time.monotonic() - task_started
+            logging.info(f"[TASK] Search completed (took {duration:.2f} seconds)")
             
-        logging.debug(f"[TASK] Search results: {results}")
+        # Lazy %s formatting, results can be a long list and are only wanted at DEBUG
+        logging.debug("[TASK] Search results: %s", results)
         return jsonify(results)
             
     except Exception as e:
@@ -453,15 +554,7 @@ async def search():
 @app.route('/about')
 def about():
     try:
-        # Read the markdown file
-        md_path = os.path.join(app.root_path, 'templates', 'about.md')
-        with open(md_path, 'r') as f:
-            content = f.read()
-            
-        # Convert markdown to HTML
-        html_content = markdowner.convert(content)
-        
-        return render_template('about.html', content=html_content)
+        return markdown_page_response('about')
     except Exception as e:
         app.logger.error(f"Error rendering about page: {str(e)}")
         return f"Error loading about page: {str(e)}", 500
@@ -469,40 +562,18 @@ def about():
 @app.route('/faq')
 def faq():
     try:
-        # Read the markdown file
-        md_path = os.path.join(app.root_path, 'templates', 'faq.md')
-        with open(md_path, 'r') as f:
-            content = f.read()
-            
-        # Convert markdown to HTML
-        html_content = markdowner.convert(content)
-        
-        return render_template('faq.html', content=html_content)
+        return markdown_page_response('faq')
     except Exception as e:
         app.logger.error(f"Error rendering FAQ page: {str(e)}")
         return f"Error loading FAQ page: {str(e)}", 500
 
-def create_chrome_driver():
-    from selenium.webdriver.chrome.service import Service
-    from webdriver_manager.chrome import ChromeDriverManager
-    from webdriver_manager.core.os_manager import ChromeType
-    
-    chrome_options = Options()
-    chrome_options.add_argument('--headless=new')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.binary_location = '/usr/bin/google-chrome-stable'
-    chrome_options.add_argument('--window-size=1920,1080')
-    chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36')
-    
-    service = Service(ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install())
-    return webdriver.Chrome(service=service, options=chrome_options)
-
 # Register cleanup function
 def cleanup_webdriver_pool():
-    logging.info("Cleaning up WebDriver pool")
+    from headers_driver_pool import headers_driver_pool
+
+    logging.info("Cleaning up WebDriver pools")
     driver_pool.cleanup_all()
+    headers_driver_pool.cleanup_all()
 
 atexit.register(cleanup_webdriver_pool)
 
@@ -0,0 +1,88 @@
+from collections import OrderedDict
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a fixed number of seconds"""
+
+    def __init__(self, maxsize=1024, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store value under key for ttl seconds (default self.ttl), evicting the least recently used entry if full"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one, across threads and event loops.
+
+    The first caller for a key runs the coroutine, later callers wait for its result.
+    Each Flask request has its own event loop, so results are shared through a
+    concurrent.futures.Future rather than an asyncio one.
+    """
+
+    def __init__(self):
+        self._inflight = {}  # key -> concurrent.futures.Future
+        self._lock = threading.Lock()
+
+    async def run(self, key, func, *args, **kwargs):
+        """Await func(*args, **kwargs), or the result of an identical call already in flight"""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+
+        if not leader:
+            try:
+                # Shield so a cancelled waiter doesn't cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled rather than us, so do the call ourselves
+                return await func(*args, **kwargs)
+
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            if not future.done():
+                # The leader was cancelled, waiters fall back to making the call themselves
+                future.cancel()
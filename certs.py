@@ -1,34 +1,50 @@
-from urllib.parse import urlparse
 import argparse
 import logging
 import asyncio
 import aiohttp
 import json
-from datetime import datetime, timezone
+import functools
+from datetime import datetime
+import orjson
+import tldextract
+
+from http_session import open_session
 
 # Configure module logger
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())  # Allow parent logger to handle output
 
+# Use the Public Suffix List snapshot bundled with tldextract so lookups never fetch it over the network
+suffix_extractor = tldextract.TLDExtract(suffix_list_urls=())
+
+# The snapshot is parsed on first use, so do that at import rather than in the first
+# request. With gunicorn --preload the parsed list is then shared by every worker.
+suffix_extractor('example.com')
+
+# Errors that won't change on retry, so get_first_certificate gives up straight away
+PERMANENT_ERRORS = {'HTTP 404', 'No Certificates Found'}
+
 def log_prefix(func_name):
     """Create a consistent log prefix for easier debugging"""
     return f"[CERTS] {func_name}:"
 
+@functools.lru_cache(maxsize=4096)
 def extract_main_domain(url):
-    """Extract the main domain from a URL, ignoring subdomains."""
-    if not url.startswith(('http://', 'https://')):
-        url = 'https://' + url
-    
-    parsed = urlparse(url)
-    domain_parts = parsed.netloc.split('.')
+    """Extract the main domain from a URL, ignoring subdomains. Results are memoised per URL."""
+    extracted = suffix_extractor(url)
     
-    # Handle cases like co.uk, com.au, etc. Think this is all of them? TODO: check this.
-    if len(domain_parts) > 2 and domain_parts[-2] in ['co', 'com', 'org', 'net']:
-        return '.'.join(domain_parts[-3:])
-    return '.'.join(domain_parts[-2:])
+    # IP addresses and hosts without a public suffix (e.g. localhost) are used as they are
+    if not extracted.suffix:
+        return extracted.domain
+    return f"{extracted.domain}.{extracted.suffix}"
+
+async def get_certificate_json(domain, session=None):
+    """Get certificate data from crt.sh JSON API.
 
-async def get_certificate_json(domain):
-    """Get certificate data from crt.sh JSON API."""
+    Args:
+        domain: The domain to look up
+        session: Optional shared aiohttp session to reuse connections
+    """
     prefix = log_prefix("get_certificate_json")
     logger.debug(f"{prefix} Fetching JSON data for domain: {domain}")
     
@@ -36,7 +52,7 @@ async def get_certificate_json(domain):
     logger.debug(f"{prefix} Connecting to {url}...")
 
     try:
-        async with aiohttp.ClientSession() as session:
+        async with open_session(session) as session:
             async with session.get(url) as response:
                 
                 if response.status != 200:
@@ -55,7 +71,9 @@ async def get_certificate_json(domain):
                     }
                 
                 try:
-                    certs = await response.json()
+                    # Popular domains return tens of MB, so decode the raw bytes with orjson rather than
+                    # building an intermediate str for json.loads
+                    certs = orjson.loads(await response.read())
                 except json.JSONDecodeError as e:
                     logger.error(f"{prefix} Failed to parse JSON response: {e}")
                     return {
@@ -74,9 +92,8 @@ async def get_certificate_json(domain):
                         'message': 'No SSL certificate history found for this domain.'
                     }
                 
-                # Sort by entry_timestamp to get the oldest certificate
-                certs.sort(key=lambda x: x['entry_timestamp'])
-                oldest_cert = certs[0]
+                # Only the oldest certificate is used, so a linear scan beats sorting the lot
+                oldest_cert = min(certs, key=lambda x: x['entry_timestamp'])
                 
                 # Convert dates to the standard format: DD-MM-YYYY HH:MM:SS UTC
                 entry_date = datetime.fromisoformat(oldest_cert['entry_timestamp'].replace('Z', '+00:00'))
@@ -136,48 +153,55 @@ async def check_crtsh_status():
             'message': 'Unable to connect to crt.sh. Please check the connection and try again.'
         }
 
-async def get_first_certificate(domain):
+async def get_first_certificate(domain, session=None):
     """
     Connect to crt.sh and attempt to retrieve certificate information.
     Returns tuple of (success, result), where result is either the data or error message.
     Crt.sh is frequently down and gives 50x errors so we retry a few times.
+    Pass a shared aiohttp session to reuse connections across lookups, otherwise
+    one is opened for the duration of the retries.
     """
     prefix = log_prefix("get_first_certificate")
     logger.debug(f"{prefix} Starting search for domain: {domain}")
     
     max_retries = 3
     
-    for attempt in range(max_retries):
-        try:
-            if attempt > 0:
-                # Add exponential backoff between attempts
-                backoff = 2 ** attempt
-                logger.debug(f"{prefix} Retry attempt {attempt + 1}/{max_retries}, waiting {backoff} seconds")
-                await asyncio.sleep(backoff)
+    # Keep one session for every attempt so retries reuse the pooled crt.sh connection
+    async with open_session(session) as session:
+        for attempt in range(max_retries):
+            try:
+                if attempt > 0:
+                    # Add capped exponential backoff between attempts
+                    backoff = min(0.5 * 2 ** attempt, 4)
+                    logger.debug(f"{prefix} Retry attempt {attempt + 1}/{max_retries}, waiting {backoff} seconds")
+                    await asyncio.sleep(backoff)
             
-            cert_data = await get_certificate_json(domain)
+                cert_data = await get_certificate_json(domain, session=session)
             
-            # Check if we got an error response
-            if cert_data.get('error'):
-                if attempt == max_retries - 1:
-                    logger.error(f"{prefix} Failed after {max_retries} attempts: {cert_data['error']}")
-                    return False, cert_data
-                continue
+                # Check if we got an error response
+                if cert_data.get('error'):
+                    if cert_data['error'] in PERMANENT_ERRORS:
+                        logger.debug(f"{prefix} Not retrying: {cert_data['error']}")
+                        return False, cert_data
+                    if attempt == max_retries - 1:
+                        logger.error(f"{prefix} Failed after {max_retries} attempts: {cert_data['error']}")
+                        return False, cert_data
+                    continue
             
-            logger.info(f"{prefix} Successfully retrieved certificate data for {domain}")
-            return True, cert_data
+                logger.info(f"{prefix} Successfully retrieved certificate data for {domain}")
+                return True, cert_data
             
-        except Exception as e:
-            error_msg = f"Unexpected error: {str(e)}"
-            logger.error(f"{prefix} {error_msg}")
+            except Exception as e:
+                error_msg = f"Unexpected error: {str(e)}"
+                logger.error(f"{prefix} {error_msg}")
             
-            if attempt == max_retries - 1:
-                return False, {
-                    'type': 'SSL Certificate',
-                    'error': error_msg,
-                    'status': 'Error',
-                    'message': 'An error occurred while retrieving certificate data. Please try again later.'
-                }
+                if attempt == max_retries - 1:
+                    return False, {
+                        'type': 'SSL Certificate',
+                        'error': error_msg,
+                        'status': 'Error',
+                        'message': 'An error occurred while retrieving certificate data. Please try again later.'
+                    }
     
     # This should never be reached due to the return in the loop
     return False, {
@@ -187,44 +211,55 @@ async def get_first_certificate(domain):
         'message': 'Unable to retrieve certificate data from crt.sh after multiple attempts. Please try again later.'
     }
 
-def get_certificate_data(domain):
+async def get_first_certificates(domains, max_concurrency=8, session=None):
     """
-    Synchronous wrapper for get_first_certificate (deprecated).
-    Use get_first_certificate instead for async operations.
-    This is leftover from the original HTMLscraping method
+    Look up the first certificate for several domains concurrently.
+    Returns a dict of domain -> (success, result), as from get_first_certificate.
+    At most max_concurrency lookups run at once so crt.sh isn't flooded.
     """
-    prefix = log_prefix("get_certificate_data")
-    logger.warning(f"{prefix} This function is deprecated. Use get_first_certificate instead.")
-    try:
-        loop = asyncio.get_event_loop()
-        success, result = loop.run_until_complete(get_first_certificate(domain))
-        return result if success else None
-    except Exception as e:
-        logger.error(f"{prefix} Error getting certificate data: {str(e)}")
-        return None
+    prefix = log_prefix("get_first_certificates")
+    domains = list(dict.fromkeys(domains))  # Drop duplicates, keep order
+    logger.debug(f"{prefix} Looking up {len(domains)} domains, {max_concurrency} at a time")
+    
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def lookup(domain, session):
+        async with semaphore:
+            return await get_first_certificate(domain, session=session)
+    
+    # One session for the whole batch so lookups share pooled connections
+    async with open_session(session) as session:
+        results = await asyncio.gather(*(lookup(domain, session) for domain in domains))
+    
+    return dict(zip(domains, results))
 
 async def main():
-    parser = argparse.ArgumentParser(description='Get the first SSL certificate for a domain from crt.sh')
-    parser.add_argument('url', help='The URL or domain to check (e.g., example.com or https://example.com)')
+    parser = argparse.ArgumentParser(description='Get the first SSL certificate for one or more domains from crt.sh')
+    parser.add_argument('urls', nargs='+', help='The URLs or domains to check (e.g., example.com or https://example.com)')
     args = parser.parse_args()
 
-    # Extract the main domain
-    domain = extract_main_domain(args.url)
-    logging.info(f"Extracted domain: {domain}")
+    # Extract the main domains
+    domains = [extract_main_domain(url) for url in args.urls]
+    logging.info(f"Extracted domains: {', '.join(domains)}")
     
-    # Get certificate info
+    # Get certificate info, looking up all domains concurrently
     logging.info(f"Attempting to fetch certificate information from crt.sh...")
-    success, result = await get_first_certificate(domain)
+    results = await get_first_certificates(domains)
     
-    if success:
-        print("\nCertificate found:")
-        print(f"Common Name: {result['Common Name']}")
-        print(f"First Seen: {result['First Seen']}")
-        print(f"Valid From: {result['Valid From']}")
-        print(f"Source: {result['Source']}")
-    else:
-        print("Failed!")
-        print(f"Error: {result}")
+    for domain, (success, result) in results.items():
+        if success:
+            print(f"\nCertificate found for {domain}:")
+            print(f"Common Name: {result['Common Name']}")
+            print(f"First Seen: {result['First Seen']}")
+            print(f"Valid From: {result['Valid From']}")
+            print(f"Source: {result['Source']}")
+        else:
+            print(f"\nFailed for {domain}!")
+            print(f"Error: {result}")
 
 if __name__ == "__main__":
+    # Set up logging when running as main script, set LOG_LEVEL=DEBUG for detailed output
+    import os
+    logging.basicConfig(level=getattr(logging, os.environ.get('LOG_LEVEL', 'INFO').upper(), logging.INFO))
+    
     asyncio.run(main()) 
\ No newline at end of file
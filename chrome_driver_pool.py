@@ -7,6 +7,24 @@ from queue import Queue, Empty
 import time
 import psutil
 import gc
+import os
+import shutil
+import functools
+
+@functools.lru_cache(maxsize=None)
+def get_chromedriver_path():
+    """Locate chromedriver once per process.
+
+    Service() without a path runs Selenium Manager to find the driver every time
+    a browser starts. Returns None if chromedriver isn't on PATH, in which case
+    Selenium Manager is left to resolve it.
+    """
+    path = os.environ.get('CHROMEDRIVER_PATH') or shutil.which('chromedriver')
+    if path:
+        logging.info(f"Using chromedriver at {path}")
+    else:
+        logging.warning("chromedriver not found on PATH, falling back to Selenium Manager")
+    return path
 
 class WebDriverPool:
     _instance = None
@@ -73,7 +91,7 @@ class WebDriverPool:
         # Page load strategy
         chrome_options.page_load_strategy = 'eager'
         
-        service = Service()
+        service = Service(get_chromedriver_path())
         driver = webdriver.Chrome(service=service, options=chrome_options)
         driver.set_page_load_timeout(30)
         return driver
@@ -1,21 +1,19 @@
-from flask import Flask
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException, StaleElementReferenceException
-from webdriver_manager.chrome import ChromeDriverManager
 import asyncio
 import aiohttp
+import lxml.html
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import logging
 from urllib.parse import urlparse
 import time
-import random
 import json
 
+from http_session import open_session
+
 # Configure module logger
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())  # Allow parent logger to handle output
@@ -30,12 +28,19 @@ def format_datetime(dt):
         dt = dt.replace(tzinfo=timezone.utc)
     return dt.strftime('%d-%m-%Y %H:%M:%S %Z')
 
-async def get_media_dates_fallback(url):
+def parse_http_date(value):
+    """Parse an HTTP date header (e.g. Last-Modified) into an aware UTC datetime, raising ValueError if invalid"""
+    dt = parsedate_to_datetime(value)
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+async def get_media_dates_fallback(url, session=None):
     """Fallback method that uses pure aiohttp without WebDriver"""
     logging.info(f"Using aiohttp fallback for URL: {url}")
     
     try:
-        async with aiohttp.ClientSession() as session:
+        async with open_session(session) as session:
             async with session.get(url) as response:
                 logging.info(f"Attempting to connect to {url}")
                 logging.info(f"Connection status: {response.status}")
@@ -66,35 +71,47 @@ async def get_media_dates_fallback(url):
                 # Parse response headers for Link tags
                 content_type = response.headers.get('Content-Type', '').lower()
                 if 'text/html' in content_type:
-                    html = await response.text()
-                    from bs4 import BeautifulSoup
-                    soup = BeautifulSoup(html, 'html.parser')
+                    html = await response.read()
                     
                     # Find all image and icon links
                     media_urls = set()
                     
-                    # Add favicon links
-                    for link in soup.find_all('link', rel=lambda x: x and ('icon' in x.lower() or 'shortcut' in x.lower())):
-                        if 'href' in link.attrs:
-                            media_urls.add(link['href'])
+                    if html.strip():
+                        # Walk lxml's tree directly, only two attributes are needed so BeautifulSoup adds nothing
+                        doc = lxml.html.fromstring(html)
+                        
+                        # Add favicon links
+                        for link in doc.iter('link'):
+                            rel = (link.get('rel') or '').lower()
+                            if ('icon' in rel or 'shortcut' in rel) and link.get('href'):
+                                media_urls.add(link.get('href'))
+                        
+                        # Add image sources
+                        for img in doc.iter('img'):
+                            if img.get('src'):
+                                media_urls.add(img.get('src'))
+                    
+                    # Make URLs absolute and drop inline data URLs
+                    from urllib.parse import urljoin
+                    media_urls = [
+                        media_url if media_url.startswith(('http://', 'https://')) else urljoin(url, media_url)
+                        for media_url in media_urls
+                        if not media_url.startswith('data:')
+                    ]
                     
-                    # Add image sources
-                    for img in soup.find_all('img'):
-                        if 'src' in img.attrs:
-                            media_urls.add(img['src'])
+                    # Check all media URLs concurrently, the session caps connections per host
+                    last_modified_values = await asyncio.gather(
+                        *(get_last_modified(session, media_url) for media_url in media_urls),
+                        return_exceptions=True
+                    )
                     
                     # Process each media URL
                     results = []
-                    for media_url in media_urls:
-                        if media_url.startswith('data:'):
+                    for media_url, last_modified in zip(media_urls, last_modified_values):
+                        if isinstance(last_modified, Exception):
+                            logging.warning(f"Error checking {media_url}: {str(last_modified)}")
                             continue
-                            
-                        # Make URL absolute if needed
-                        if not media_url.startswith(('http://', 'https://')):
-                            from urllib.parse import urljoin
-                            media_url = urljoin(url, media_url)
                         
-                        last_modified = await get_last_modified(session, media_url)
                         if last_modified and isinstance(last_modified, datetime):
                             results.append({
                                 'type': get_media_type(media_url),
@@ -170,8 +187,7 @@ async def get_last_modified(session, url, max_retries=3):
                 
                 if last_modified:
                     try:
-                        dt = datetime.strptime(last_modified, '%a, %d %b %Y %H:%M:%S GMT')
-                        dt = dt.replace(tzinfo=timezone.utc)
+                        dt = parse_http_date(last_modified)
                         return dt
                     except ValueError:
                         logging.warning(f"Invalid date format in header for {url}: {last_modified}")
@@ -187,8 +203,7 @@ async def get_last_modified(session, url, max_retries=3):
                         )
                         if last_modified:
                             try:
-                                dt = datetime.strptime(last_modified, '%a, %d %b %Y %H:%M:%S GMT')
-                                dt = dt.replace(tzinfo=timezone.utc)
+                                dt = parse_http_date(last_modified)
                                 return dt
                             except ValueError:
                                 logging.warning(f"Invalid date format in header for {url}: {last_modified}")
@@ -267,44 +282,81 @@ def get_media_type(url):
     else:
         return 'media'
 
+async def get_direct_media_date(url, session=None):
+    """Get the Last-Modified date for a URL that points straight at a media file, without a browser"""
+    async with open_session(session) as session:
+        last_modified = await get_last_modified(session, url)
+    
+    if isinstance(last_modified, datetime):
+        return [{
+            'type': get_media_type(url),
+            'url': url,
+            'last_modified': format_datetime(last_modified),
+            '_last_modified_dt': last_modified
+        }]
+    if isinstance(last_modified, dict) and 'error' in last_modified:
+        return [{
+            'type': 'Error',
+            'url': url,
+            'error': last_modified['error']
+        }]
+    return [{
+        'type': 'Info',
+        'error': 'No last-modified header found for this media file.'
+    }]
+
+def find_favicon_urls(driver):
+    """Return the absolute hrefs of the page's icon links in a single WebDriver call"""
+    # rel*='icon' also matches 'shortcut icon' and 'apple-touch-icon'
+    return driver.execute_script(
+        "return Array.from(document.querySelectorAll(\"link[rel*='icon']\"), link => link.href);"
+    ) or []
+
 def get_media_dates_with_cdp(driver, url):
     """Get media dates using Chrome DevTools Protocol (CDP) - much faster approach"""
     prefix = log_prefix("get_media_dates_with_cdp")
     logger.info(f"{prefix} Starting CDP-based retrieval for URL: {url}")
     
+    # The diagnostics below cost WebDriver round-trips, so only gather them when they'll be logged
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    
     try:
         # Hypothesis A,B,C,D: Log driver state and system resources at entry
-        import os
-        page_load_strategy = driver.capabilities.get('pageLoadStrategy', 'unknown')
-        mem_available_mb = 0
-        try:
-            if hasattr(os, 'sysconf'):
-                mem_available_mb = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_AVPHYS_PAGES') / 1024 / 1024
-        except:
-            pass
-        logger.info(f"{prefix} [DEBUG-H:A,B,C,D] CDP entry - driver_session={driver.session_id}, page_load_strategy={page_load_strategy}, memory_available_mb={mem_available_mb:.2f}")
+        if debug_enabled:
+            import os
+            page_load_strategy = driver.capabilities.get('pageLoadStrategy', 'unknown')
+            mem_available_mb = 0
+            try:
+                if hasattr(os, 'sysconf'):
+                    mem_available_mb = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_AVPHYS_PAGES') / 1024 / 1024
+            except:
+                pass
+            logger.debug("%s [DEBUG-H:A,B,C,D] CDP entry - driver_session=%s, page_load_strategy=%s, memory_available_mb=%.2f",
+                         prefix, driver.session_id, page_load_strategy, mem_available_mb)
         
         # Clear any existing logs
         driver.get_log('performance')
         
         # Hypothesis B,C: Log state before navigation
-        current_url_before = driver.current_url
-        logger.info(f"{prefix} [DEBUG-H:B,C] Before driver.get() - url={url}, timeout_set=10s, current_url={current_url_before}, session_valid=True")
+        if debug_enabled:
+            logger.debug("%s [DEBUG-H:B,C] Before driver.get() - url=%s, timeout_set=10s, current_url=%s, session_valid=True",
+                         prefix, url, driver.current_url)
         
         # Navigate to the page with shorter timeout
         logger.info(f"{prefix} Navigating to: {url}")
         driver.set_page_load_timeout(10)  # Reduced from 15
         
         # Track navigation timing
-        import time
         nav_start = time.time()
         
         driver.get(url)
         
         # Hypothesis B,C: Log successful navigation with timing
-        nav_duration = time.time() - nav_start
-        page_title = driver.title[:100] if driver.title else ""
-        logger.info(f"{prefix} [DEBUG-H:B,C] After driver.get() SUCCESS - nav_duration_sec={nav_duration:.3f}, current_url={driver.current_url}, page_title={page_title}")
+        if debug_enabled:
+            nav_duration = time.time() - nav_start
+            page_title = (driver.title or "")[:100]
+            logger.debug("%s [DEBUG-H:B,C] After driver.get() SUCCESS - nav_duration_sec=%.3f, current_url=%s, page_title=%s",
+                         prefix, nav_duration, driver.current_url, page_title)
         
         # Wait for page to load (interactive or complete)
         try:
@@ -315,16 +367,13 @@ def get_media_dates_with_cdp(driver, url):
         except TimeoutException:
             logger.warning(f"{prefix} Page load timeout - continuing with partial content")
         
-        # Reduced wait time
-        time.sleep(1)  # Reduced from 2
-        
-        # Get performance logs with error handling
+        # Give images up to a second to finish loading, stopping as soon as the load event fires
         try:
-            logs = driver.get_log('performance')
-            logger.info(f"{prefix} Retrieved {len(logs)} performance log entries")
-        except Exception as e:
-            logger.error(f"{prefix} Failed to get performance logs: {e}")
-            return []
+            WebDriverWait(driver, 1, poll_frequency=0.1).until(
+                lambda d: d.execute_script('return document.readyState') == 'complete'
+            )
+        except TimeoutException:
+            logger.debug(f"{prefix} Page still loading - collecting the responses seen so far")
         
         # Process logs with memory management
         media_responses = []
@@ -335,28 +384,12 @@ def get_media_dates_with_cdp(driver, url):
         
         # Get favicon URLs from the page
         try:
-            favicon_selectors = [
-                "link[rel='icon']",
-                "link[rel='shortcut icon']",
-                "link[rel='apple-touch-icon']",
-                "link[rel*='icon']"
-            ]
-            
             favicon_found = False
-            for selector in favicon_selectors:
-                try:
-                    favicon_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    for favicon in favicon_elements:
-                        try:
-                            favicon_url = favicon.get_attribute('href')
-                            if favicon_url and not favicon_url.startswith('data:'):
-                                media_dict[favicon_url] = 'favicon'
-                                logger.info(f"{prefix} Found favicon in HTML: {favicon_url}")
-                                favicon_found = True
-                        except Exception as e:
-                            logger.debug(f"{prefix} Error getting favicon href: {str(e)}")
-                except Exception as e:
-                    logger.debug(f"{prefix} Error with selector {selector}: {str(e)}")
+            for favicon_url in find_favicon_urls(driver):
+                if favicon_url and not favicon_url.startswith('data:'):
+                    media_dict[favicon_url] = 'favicon'
+                    logger.debug("%s Found favicon in HTML: %s", prefix, favicon_url)
+                    favicon_found = True
             
             # Add default favicon path if none found
             if not favicon_found:
@@ -367,26 +400,31 @@ def get_media_dates_with_cdp(driver, url):
         except Exception as e:
             logger.warning(f"{prefix} Error building favicon dictionary: {str(e)}")
         
-        # Actively request favicon URLs to ensure they appear in CDP logs
-        if media_dict:
-            logger.info(f"{prefix} Actively requesting {len(media_dict)} media URLs to ensure they're captured")
-            for media_url, media_type in media_dict.items():
-                if media_type == 'favicon':
-                    try:
-                        # Use JavaScript to request the favicon, triggering a network request
-                        script = f"""
-                        (function() {{
-                            var img = new Image();
-                            img.src = "{media_url}";
-                        }})();
-                        """
-                        driver.execute_script(script)
-                        logger.info(f"{prefix} Triggered request for favicon: {media_url}")
-                    except Exception as e:
-                        logger.warning(f"{prefix} Failed to trigger request for {media_url}: {str(e)}")
-            
-            # Give the browser a moment to initiate these requests
-            time.sleep(0.5)
+        # Actively request favicon URLs to ensure they appear in CDP logs, waiting until
+        # each has loaded or failed (at most a second) rather than sleeping
+        favicon_urls = [media_url for media_url, media_type in media_dict.items() if media_type == 'favicon']
+        if favicon_urls:
+            logger.info(f"{prefix} Actively requesting {len(favicon_urls)} favicon URLs to ensure they're captured")
+            try:
+                driver.execute_async_script("""
+                    var urls = arguments[0], done = arguments[arguments.length - 1], pending = urls.length;
+                    urls.forEach(function (src) {
+                        var img = new Image();
+                        img.onload = img.onerror = function () { if (--pending === 0) done(); };
+                        img.src = src;
+                    });
+                    setTimeout(done, 1000);
+                """, favicon_urls)
+            except Exception as e:
+                logger.warning(f"{prefix} Failed to trigger favicon requests: {str(e)}")
+        
+        # Get performance logs with error handling
+        try:
+            logs = driver.get_log('performance')
+            logger.info(f"{prefix} Retrieved {len(logs)} performance log entries")
+        except Exception as e:
+            logger.error(f"{prefix} Failed to get performance logs: {e}")
+            return []
         
         # Limit the number of logs processed to prevent memory issues
         max_logs = 2000
@@ -395,91 +433,92 @@ def get_media_dates_with_cdp(driver, url):
         
         # Track request ID to original URL mapping for redirect handling
         request_id_to_original_url = {}
+        responses = []
         
-        # First pass: map request IDs to original URLs
+        # Single pass over the log: map request IDs to original URLs and keep the responses.
+        # Most entries are other events, so skip decoding any that can't be one of these two.
         for log in logs_to_process:
+            raw_message = log.get('message', '')
+            if 'Network.requestWillBeSent' not in raw_message and 'Network.responseReceived' not in raw_message:
+                continue
             try:
-                message = json.loads(log['message'])
-                method = message['message'].get('method')
+                message = json.loads(raw_message)['message']
+                method = message.get('method')
                 
                 if method == 'Network.requestWillBeSent':
-                    params = message['message']['params']
+                    params = message['params']
                     request_id = params['requestId']
                     request_url = params['request']['url']
                     # Store the original request URL (first request for this ID)
                     if request_id not in request_id_to_original_url:
                         request_id_to_original_url[request_id] = request_url
+                elif method == 'Network.responseReceived':
+                    responses.append(message['params'])
             except (json.JSONDecodeError, KeyError):
                 continue
         
         logger.info(f"{prefix} Tracked {len(request_id_to_original_url)} request IDs for redirect handling")
         
         # Second pass: process responses
-        for log in logs_to_process:
+        for params in responses:
             try:
-                message = json.loads(log['message'])
-                method = message['message'].get('method')
+                response = params['response']
+                response_url = response['url']
+                request_id = params['requestId']
                 
-                if method == 'Network.responseReceived':
-                    params = message['message']['params']
-                    response = params['response']
-                    response_url = response['url']
-                    request_id = params['requestId']
+                # Check if this is a media URL
+                if is_media_url(response_url) and response_url not in processed_urls:
+                    processed_urls.add(response_url)
                     
-                    # Check if this is a media URL
-                    if is_media_url(response_url) and response_url not in processed_urls:
-                        processed_urls.add(response_url)
-                        
-                        # Get headers
-                        headers = response.get('headers', {})
-                        last_modified = (
-                            headers.get('last-modified') or
-                            headers.get('Last-Modified') or
-                            headers.get('x-last-modified') or
-                            headers.get('X-Last-Modified')
-                        )
-                        
-                        if last_modified:
-                            try:
-                                # Parse the date
-                                dt = datetime.strptime(last_modified, '%a, %d %b %Y %H:%M:%S GMT')
-                                dt = dt.replace(tzinfo=timezone.utc)
-                                
-                                # Determine media type: check if original request was for a favicon
-                                original_url = request_id_to_original_url.get(request_id, response_url)
-                                
-                                # Preserve 'favicon' type if the original URL was marked as such
-                                if original_url in media_dict and media_dict[original_url] == 'favicon':
-                                    media_type = 'favicon'
-                                    if original_url != response_url:
-                                        logger.info(f"{prefix} Preserving 'favicon' type through redirect: {original_url} -> {response_url}")
-                                else:
-                                    # Otherwise determine by file extension of final URL
-                                    media_type = get_media_type(response_url)
-                                
-                                media_responses.append({
-                                    'type': media_type,
-                                    'url': response_url,
-                                    'last_modified': format_datetime(dt),
-                                    '_last_modified_dt': dt
-                                })
-                                
-                                logger.info(f"{prefix} Found {media_type}: {response_url} - {format_datetime(dt)}")
-                                
-                            except ValueError as e:
-                                logger.warning(f"{prefix} Invalid date format for {response_url}: {last_modified} - {e}")
-                        else:
-                            # Log images that were detected but don't have last-modified header
-                            # Check if original request was for a favicon
+                    # Get headers
+                    headers = response.get('headers', {})
+                    last_modified = (
+                        headers.get('last-modified') or
+                        headers.get('Last-Modified') or
+                        headers.get('x-last-modified') or
+                        headers.get('X-Last-Modified')
+                    )
+                    
+                    if last_modified:
+                        try:
+                            # Parse the date
+                            dt = parse_http_date(last_modified)
+                            
+                            # Determine media type: check if original request was for a favicon
                             original_url = request_id_to_original_url.get(request_id, response_url)
+                            
+                            # Preserve 'favicon' type if the original URL was marked as such
                             if original_url in media_dict and media_dict[original_url] == 'favicon':
                                 media_type = 'favicon'
+                                if original_url != response_url:
+                                    logger.debug("%s Preserving 'favicon' type through redirect: %s -> %s", prefix, original_url, response_url)
                             else:
+                                # Otherwise determine by file extension of final URL
                                 media_type = get_media_type(response_url)
-                            logger.info(f"{prefix} Found {media_type} WITHOUT last-modified header: {response_url}")
                             
-            except (json.JSONDecodeError, KeyError) as e:
-                logger.debug(f"{prefix} Error parsing log entry: {e}")
+                            media_responses.append({
+                                'type': media_type,
+                                'url': response_url,
+                                'last_modified': format_datetime(dt),
+                                '_last_modified_dt': dt
+                            })
+                            
+                            logger.debug("%s Found %s: %s - %s", prefix, media_type, response_url, dt)
+                            
+                        except ValueError as e:
+                            logger.warning(f"{prefix} Invalid date format for {response_url}: {last_modified} - {e}")
+                    elif debug_enabled:
+                        # Log images that were detected but don't have last-modified header
+                        # Check if original request was for a favicon
+                        original_url = request_id_to_original_url.get(request_id, response_url)
+                        if original_url in media_dict and media_dict[original_url] == 'favicon':
+                            media_type = 'favicon'
+                        else:
+                            media_type = get_media_type(response_url)
+                        logger.debug("%s Found %s WITHOUT last-modified header: %s", prefix, media_type, response_url)
+                        
+            except KeyError as e:
+                logger.debug("%s Error parsing log entry: %s", prefix, e)
                 continue
         
         logger.info(f"{prefix} CDP method found {len(media_responses)} media items with last-modified headers")
@@ -497,7 +536,6 @@ def get_media_dates_with_cdp(driver, url):
     except Exception as e:
         # Hypothesis A,B,C,D,E: Log detailed exception info with timing
         import traceback
-        import time
         nav_duration = time.time() - nav_start if 'nav_start' in locals() else -1
         error_type = type(e).__name__
         error_msg = str(e)[:500]
@@ -509,10 +547,111 @@ def get_media_dates_with_cdp(driver, url):
         logger.error(f"{prefix} Error in CDP method: {str(e)}")
         return []
 
-async def get_media_dates(url):
+def collect_media_with_webdriver(driver, url):
+    """Load a page in WebDriver and collect its favicon and image URLs (blocking)"""
+    prefix = log_prefix("collect_media_with_webdriver")
+    
+    driver.set_page_load_timeout(15)  # Short timeout for headers
+    driver.get(url)
+    
+    try:
+        WebDriverWait(driver, 10).until(
+            lambda d: d.execute_script('return document.readyState') == 'complete'
+        )
+        logging.info("Page load complete")
+    except TimeoutException:
+        logging.warning("Page load timeout - continuing with partial content")
+    
+    # Dictionary to store media items with their types
+    media_dict = {}  # Use dictionary instead of set to maintain order
+    
+    # Get favicon URLs
+    logging.info("Searching for favicons...")
+    favicon_found = False
+    try:
+        for favicon_url in find_favicon_urls(driver):
+            if favicon_url and not favicon_url.startswith('data:'):
+                media_dict[favicon_url] = 'favicon'
+                logging.info(f"{prefix} Found favicon: {favicon_url}")
+                favicon_found = True
+            else:
+                logging.debug(f"{prefix} Skipping data URL or empty favicon: {favicon_url}")
+    except Exception as e:
+        logging.warning(f"{prefix} Error getting favicons: {str(e)}")
+    
+    if not favicon_found:
+        default_favicon = f"{urlparse(url).scheme}://{urlparse(url).netloc}/favicon.ico"
+        media_dict[default_favicon] = 'favicon'
+        logging.info(f"Added default favicon location: {default_favicon}")
+    
+    # Get images
+    logging.info("Searching for images...")
+    try:
+        # Read every src in one script call rather than a round-trip per element
+        images = driver.execute_script("return Array.from(document.images, img => img.src);") or []
+        for src in images:
+            if src:
+                media_dict[src] = 'image'
+                logging.info(f"Found image: {src}")
+    except Exception as e:
+        logging.warning(f"Error getting images: {str(e)}")
+    
+    return media_dict
+
+# Selenium calls block, so they run on their own threads to keep the event loop free
+# for the RDAP and certificate lookups running alongside. Sized above the headers
+# pool so threads waiting on get_driver() can't starve threads holding a driver.
+selenium_executor = ThreadPoolExecutor(max_workers=10, thread_name_prefix='selenium')
+
+async def acquire_driver(pool):
+    """Get a driver from the pool without blocking the event loop.
+
+    If the waiting task is cancelled the driver is returned to the pool once
+    get_driver() finishes, rather than being leaked.
+    """
+    future = selenium_executor.submit(pool.get_driver)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        def release(done):
+            if not done.cancelled() and done.exception() is None and done.result():
+                pool.return_driver(done.result())
+        future.add_done_callback(release)
+        raise
+
+async def run_with_driver(pool, func, driver, *args):
+    """Run a blocking call that uses a pooled driver without blocking the event loop.
+
+    The call can't be interrupted once started, so if the waiting task is
+    cancelled the driver is returned to the pool when the call finishes.
+    """
+    future = selenium_executor.submit(func, driver, *args)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        future.add_done_callback(lambda _: pool.return_driver(driver))
+        raise
+
+async def release_driver(pool, driver, cleanup=False):
+    """Return a driver to the pool, or clean it up, without blocking the event loop.
+
+    Returning a driver health-checks and resets it over WebDriver calls. The release
+    is shielded so it still completes if the waiting task is cancelled.
+    """
+    release = pool._cleanup_driver if cleanup else pool.return_driver
+    future = selenium_executor.submit(release, driver)
+    await asyncio.shield(asyncio.wrap_future(future))
+
+async def get_media_dates(url, session=None):
+    """Get Last-Modified dates for media on a page, optionally reusing an aiohttp session"""
     prefix = log_prefix("get_media_dates")
     logger.info(f"{prefix} Starting for URL: {url}")
     
+    # A URL that is itself an image or icon only needs a HEAD request, not a browser
+    if is_media_url(urlparse(url).path):
+        logging.info(f"{prefix} URL points to a media file, checking it directly")
+        return await get_direct_media_date(url, session=session)
+    
     from headers_driver_pool import headers_driver_pool
     
     results = []
@@ -523,18 +662,16 @@ async def get_media_dates(url):
     # Try CDP method first (fastest)
     try:
         logging.info(f"{prefix} Attempting CDP method first")
-        driver = headers_driver_pool.get_driver()
+        driver = await acquire_driver(headers_driver_pool)
         if driver:
             session_id = driver.session_id
             logging.info(f"{prefix} Got WebDriver with session ID: {session_id}")
             
             # Hypothesis D: Log driver state before CDP call
-            driver_name = driver.name
-            driver_current_url = driver.current_url
-            logging.info(f"{prefix} [DEBUG-H:D] Before CDP call - session_id={session_id}, driver_name={driver_name}, driver_current_url={driver_current_url}")
+            logging.info(f"{prefix} [DEBUG-H:D] Before CDP call - session_id={session_id}")
             
             # Try CDP method
-            cdp_results = get_media_dates_with_cdp(driver, url)
+            cdp_results = await run_with_driver(headers_driver_pool, get_media_dates_with_cdp, driver, url)
             # CDP succeeded - return results (even if empty)
             logging.info(f"{prefix} CDP method completed, found {len(cdp_results)} results")
             
@@ -543,7 +680,7 @@ async def get_media_dates(url):
             returning_info_msg = not cdp_results
             logging.info(f"{prefix} [DEBUG-H:D] After CDP call - cdp_results_count={len(cdp_results)}, results_empty={results_empty}, returning_info_msg={returning_info_msg}")
             
-            headers_driver_pool.return_driver(driver)
+            await release_driver(headers_driver_pool, driver)
             return cdp_results if cdp_results else [{
                 'type': 'Info',
                 'error': 'No media files with last-modified headers found'
@@ -555,17 +692,15 @@ async def get_media_dates(url):
         logging.warning(f"{prefix} [DEBUG-H:D] CDP outer exception - error_type={error_type}, error_msg={error_msg}")
         logging.warning(f"{prefix} CDP method failed: {str(e)}")
         if driver:
-            headers_driver_pool.return_driver(driver)
+            await release_driver(headers_driver_pool, driver)
             driver = None
         # Only proceed to fallback if CDP actually failed
     
     # If CDP method fails, try aiohttp fallback
     try:
-        results = await get_media_dates_fallback(url)
+        results = await get_media_dates_fallback(url, session=session)
         if results and not (len(results) == 1 and results[0].get('type') in ['Error', 'Info']):
             logging.info(f"{prefix} Successfully got results using aiohttp fallback")
-            if driver:
-                headers_driver_pool.return_driver(driver)
             return results
     except Exception as e:
         logging.warning(f"{prefix} Fallback method failed, will try WebDriver: {str(e)}")
@@ -574,88 +709,25 @@ async def get_media_dates(url):
     if driver is None:
         try:
             logging.info(f"{prefix} Getting WebDriver from pool for fallback")
-            driver = headers_driver_pool.get_driver()
+            driver = await acquire_driver(headers_driver_pool)
             if driver:
                 session_id = driver.session_id
                 logging.info(f"{prefix} Got WebDriver with session ID: {session_id}")
         except TimeoutError:
             logging.error(f"{prefix} Could not get WebDriver from pool")
-            return results if results else await get_media_dates_fallback(url)
+            return results if results else await get_media_dates_fallback(url, session=session)
         except Exception as e:
             logging.error(f"{prefix} Error getting WebDriver: {str(e)}")
-            return results if results else await get_media_dates_fallback(url)
+            return results if results else await get_media_dates_fallback(url, session=session)
     
     # Use WebDriver fallback method (original DOM-based approach)
     try:
         logging.info(f"{prefix} Using WebDriver fallback method")
-        driver.set_page_load_timeout(15)  # Short timeout for headers
-        driver.get(url)
-        
-        try:
-            WebDriverWait(driver, 10).until(
-                lambda d: d.execute_script('return document.readyState') == 'complete'
-            )
-            logging.info("Page load complete")
-        except TimeoutException:
-            logging.warning("Page load timeout - continuing with partial content")
-        
-        # Dictionary to store media items with their types
-        media_dict = {}  # Use dictionary instead of set to maintain order
-        
-        # Get favicon URLs
-        favicon_selectors = [
-            "link[rel='icon']",
-            "link[rel='shortcut icon']",
-            "link[rel='apple-touch-icon']",
-            "link[rel*='icon']"
-        ]
-        
-        logging.info("Searching for favicons...")
-        favicon_found = False
-        for selector in favicon_selectors:
-            try:
-                favicon_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                for favicon in favicon_elements:
-                    try:
-                        favicon_url = favicon.get_attribute('href')
-                        if favicon_url and not favicon_url.startswith('data:'):
-                            media_dict[favicon_url] = 'favicon'
-                            logging.info(f"{prefix} Found favicon: {favicon_url}")
-                            favicon_found = True
-                        else:
-                            logging.debug(f"{prefix} Skipping data URL or empty favicon: {favicon_url}")
-                    except StaleElementReferenceException:
-                        logging.warning(f"{prefix} Stale element reference when getting favicon href, skipping this favicon")
-                        continue
-                    except Exception as e:
-                        logging.warning(f"{prefix} Error getting favicon href: {str(e)}")
-                        continue
-            except Exception as e:
-                logging.warning(f"{prefix} Error getting favicon with selector {selector}: {str(e)}")
-        
-        if not favicon_found:
-            default_favicon = f"{urlparse(url).scheme}://{urlparse(url).netloc}/favicon.ico"
-            media_dict[default_favicon] = 'favicon'
-            logging.info(f"Added default favicon location: {default_favicon}")
-        
-        # Get images
-        logging.info("Searching for images...")
         try:
-            images = driver.find_elements(By.TAG_NAME, 'img')
-            for img in images:
-                try:
-                    src = img.get_attribute('src')
-                    if src:
-                        media_dict[src] = 'image'
-                        logging.info(f"Found image: {src}")
-                except StaleElementReferenceException:
-                    logging.warning("Stale element reference when getting image src, skipping this image")
-                    continue
-                except Exception as e:
-                    logging.warning(f"Error getting image src: {str(e)}")
-                    continue
-        except Exception as e:
-            logging.warning(f"Error getting images: {str(e)}")
+            media_dict = await run_with_driver(headers_driver_pool, collect_media_with_webdriver, driver, url)
+        except asyncio.CancelledError:
+            driver = None  # run_with_driver hands it back to the pool once the call finishes
+            raise
         
         # Filter valid URLs
         VALID_EXTENSIONS = ('.gif', '.jpg', '.jpeg', '.png', '.svg', '.ico', '.webp', 
@@ -677,20 +749,17 @@ async def get_media_dates(url):
                 'error': 'No images or icons found on the page to check for last-modified dates.'
             }]
 
-        async with aiohttp.ClientSession() as session:
+        async with open_session(session) as session:
             tasks = {}  # Dictionary to map tasks to their URLs
             
-            for i, media_url in enumerate(filtered_media):
+            # No staggered delay between requests, the session's per-host connection limit
+            # already keeps us from flooding a site
+            for media_url in filtered_media:
                 # Skip data URLs
                 if media_url.startswith('data:'):
                     logging.debug(f"Skipping data URL: {media_url}")
                     continue
                 
-                # Add staggered delay to avoid rate limiting
-                if i > 0:  # Don't delay the first request
-                    import random
-                    await asyncio.sleep(random.uniform(0.1, 0.3))
-                    
                 task = asyncio.create_task(get_last_modified(session, media_url))
                 tasks[task] = media_url
                 logging.info(f"Created task for URL: {media_url}")
@@ -755,14 +824,15 @@ async def get_media_dates(url):
         ]):
             # For connection errors, try aiohttp approach
             if driver:
-                headers_driver_pool.return_driver(driver)
+                await release_driver(headers_driver_pool, driver)
                 driver = None
-            return await get_media_dates_fallback(url)
+            return await get_media_dates_fallback(url, session=session)
         else:
             # For other WebDriver errors, return error
             if driver:
-                headers_driver_pool.return_driver(driver)
-            return await get_media_dates_fallback(url)
+                await release_driver(headers_driver_pool, driver)
+                driver = None
+            return await get_media_dates_fallback(url, session=session)
     
     finally:
         if driver:
@@ -770,18 +840,18 @@ async def get_media_dates(url):
                 # Verify session is still valid before returning
                 try:
                     if driver.session_id == session_id:
-                        headers_driver_pool.return_driver(driver)
+                        await release_driver(headers_driver_pool, driver)
                         logging.info(f"WebDriver with session ID {session_id} returned to pool")
                     else:
                         logging.warning(f"Session ID mismatch: expected {session_id}, got {driver.session_id}")
-                        headers_driver_pool._cleanup_driver(driver)
+                        await release_driver(headers_driver_pool, driver, cleanup=True)
                 except Exception:
                     logging.warning("Could not verify session ID, forcing cleanup")
-                    headers_driver_pool._cleanup_driver(driver)
+                    await release_driver(headers_driver_pool, driver, cleanup=True)
             except Exception as e:
                 logging.warning(f"Error handling WebDriver cleanup: {str(e)}")
                 try:
-                    headers_driver_pool._cleanup_driver(driver)
+                    await release_driver(headers_driver_pool, driver, cleanup=True)
                 except Exception as e2:
                     logging.error(f"Final cleanup attempt failed: {str(e2)}")
     
@@ -789,6 +859,10 @@ async def get_media_dates(url):
     return results
 
 if __name__ == "__main__":
+    # Set up logging when running as main script, set LOG_LEVEL=DEBUG for detailed output
+    import os
+    logging.basicConfig(level=getattr(logging, os.environ.get('LOG_LEVEL', 'INFO').upper(), logging.INFO))
+    
     # Add code to run this module independently, careful of the venv!
     import sys
     if len(sys.argv) > 1:
@@ -11,6 +11,12 @@ import tempfile
 import shutil
 import gc
 
+from chrome_driver_pool import get_chromedriver_path
+
+# Web fonts never carry dates we report, so don't download them. Images and CSS are
+# left alone because media responses (including CSS backgrounds) are what we collect.
+BLOCKED_URL_PATTERNS = ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot']
+
 class HeadersWebDriverPool:
     _instance = None
     _lock = threading.Lock()
@@ -93,13 +99,14 @@ class HeadersWebDriverPool:
         # Enable CDP capabilities - add logging preferences to Chrome options
         chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
         
-        service = Service()
+        service = Service(get_chromedriver_path())
         driver = webdriver.Chrome(service=service, options=chrome_options)
         driver.set_page_load_timeout(15)  # Shorter timeout for headers
         
         # Enable network domain for CDP
         try:
             driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
             logging.debug("CDP Network domain enabled")
         except Exception as e:
             logging.warning(f"Failed to enable CDP Network domain: {e}")
@@ -126,6 +133,35 @@ class HeadersWebDriverPool:
         except Exception:
             return False
 
+    def _perform_cleanup(self):
+        """Perform periodic cleanup of drivers that have sat idle in the pool"""
+        current_time = time.time()
+        if current_time - self.last_cleanup < self.cleanup_interval:
+            return
+        self.last_cleanup = current_time
+
+        # Drain the pool, keeping recently used drivers and quitting idle ones
+        idle_drivers = []
+        active_drivers = []
+        while True:
+            try:
+                driver = self.pool.get_nowait()
+            except Empty:
+                break
+            last_used = self.driver_timeouts.get(id(driver), current_time)
+            if current_time - last_used > self.cleanup_interval:
+                idle_drivers.append(driver)
+            else:
+                active_drivers.append(driver)
+
+        for driver in active_drivers:
+            self.pool.put(driver)
+        for driver in idle_drivers:
+            self._cleanup_driver(driver)
+
+        if idle_drivers:
+            logging.info(f"[HEADERS_POOL] Cleaned up {len(idle_drivers)} idle WebDriver(s)")
+
     def get_driver(self, timeout=10):  # Increased timeout for concurrent operations
         """Get a WebDriver instance from the pool or create a new one"""
         # Hypothesis A,D: Log pool state at entry
@@ -139,6 +175,8 @@ class HeadersWebDriverPool:
             if self._check_memory_threshold():
                 logging.warning("Memory usage above threshold, forcing cleanup")
                 self.cleanup_all()
+            else:
+                self._perform_cleanup()
                 
             # Try to get an existing driver from the pool
             driver = self.pool.get(timeout=timeout)
@@ -0,0 +1,31 @@
+from contextlib import asynccontextmanager
+import aiohttp
+
+# Connection limits for outbound lookups. Pages can reference dozens of media files on one
+# host, so cap per-host connections rather than letting one site take the whole pool.
+CONNECTION_LIMIT = 100
+CONNECTION_LIMIT_PER_HOST = 20
+DNS_CACHE_TTL = 300  # Seconds
+
+def create_session():
+    """Create an aiohttp session with the app's connection limits and DNS caching"""
+    connector = aiohttp.TCPConnector(
+        limit=CONNECTION_LIMIT,
+        limit_per_host=CONNECTION_LIMIT_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+@asynccontextmanager
+async def open_session(session=None):
+    """Yield the caller's aiohttp session, or a temporary one if none was given.
+
+    Lets lookups share one connection pool (and its warm TLS connections) when
+    the caller owns a session, while still working standalone.
+    """
+    if session is not None:
+        yield session
+        return
+
+    async with create_session() as new_session:
+        yield new_session
@@ -414,8 +414,9 @@ def get_domain_info(domain_or_url):
         return []
 
 if __name__ == "__main__":
-    # Set up logging when running as main script
-    logging.basicConfig(level=logging.DEBUG)
+    # Set up logging when running as main script, set LOG_LEVEL=DEBUG for detailed output
+    import os
+    logging.basicConfig(level=getattr(logging, os.environ.get('LOG_LEVEL', 'INFO').upper(), logging.INFO))
     
     # Run the script independently
     import sys